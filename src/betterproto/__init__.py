@@ -345,16 +345,19 @@ def map_field(
     )
 
 
+_PACK_FMT_BY_TYPE = {
+    TYPE_DOUBLE: "<d",
+    TYPE_FLOAT: "<f",
+    TYPE_FIXED32: "<I",
+    TYPE_FIXED64: "<Q",
+    TYPE_SFIXED32: "<i",
+    TYPE_SFIXED64: "<q",
+}
+
+
 def _pack_fmt(proto_type: str) -> str:
     """Returns a little-endian format string for reading/writing binary."""
-    return {
-        TYPE_DOUBLE: "<d",
-        TYPE_FLOAT: "<f",
-        TYPE_FIXED32: "<I",
-        TYPE_FIXED64: "<Q",
-        TYPE_SFIXED32: "<i",
-        TYPE_SFIXED64: "<q",
-    }[proto_type]
+    return _PACK_FMT_BY_TYPE[proto_type]
 
 
 def dump_varint(value: int, stream: "SupportsWrite[bytes]") -> None:
@@ -1305,22 +1308,24 @@ class Message(ABC):
             value: Any
             if parsed.wire_type == WIRE_LEN_DELIM and meta.proto_type in PACKED_TYPES:
                 # This is a packed repeated field.
-                pos = 0
-                value = []
-                while pos < len(parsed.value):
-                    if meta.proto_type in (TYPE_FLOAT, TYPE_FIXED32, TYPE_SFIXED32):
-                        decoded, pos = parsed.value[pos : pos + 4], pos + 4
-                        wire_type = WIRE_FIXED_32
-                    elif meta.proto_type in (TYPE_DOUBLE, TYPE_FIXED64, TYPE_SFIXED64):
-                        decoded, pos = parsed.value[pos : pos + 8], pos + 8
-                        wire_type = WIRE_FIXED_64
-                    else:
+                if meta.proto_type in FIXED_TYPES:
+                    # Fixed width values need no post-processing beyond
+                    # unpacking, so unpack the whole field at once.
+                    value = [
+                        decoded
+                        for (decoded,) in struct.iter_unpack(
+                            _pack_fmt(meta.proto_type), parsed.value
+                        )
+                    ]
+                else:
+                    pos = 0
+                    value = []
+                    while pos < len(parsed.value):
                         decoded, pos = decode_varint(parsed.value, pos)
-                        wire_type = WIRE_VARINT
-                    decoded = self._postprocess_single(
-                        wire_type, meta, field_name, decoded
-                    )
-                    value.append(decoded)
+                        decoded = self._postprocess_single(
+                            WIRE_VARINT, meta, field_name, decoded
+                        )
+                        value.append(decoded)
             else:
                 value = self._postprocess_single(
                     parsed.wire_type, meta, field_name, parsed.value
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import os
 import re
+from functools import lru_cache
 from typing import (
     TYPE_CHECKING,
     Dict,
+    FrozenSet,
     List,
     Set,
     Tuple,
@@ -32,6 +34,7 @@ WRAPPER_TYPES: Dict[str, Type] = {
 }
 
 
+@lru_cache(maxsize=None)
 def parse_source_type_name(field_type_name: str) -> Tuple[str, str]:
     """
     Split full source type name into package and type name.
@@ -72,6 +75,22 @@ def get_type_reference(
         elif source_type == ".google.protobuf.Timestamp":
             return "datetime"
 
+    reference, reference_imports = _get_package_reference(
+        package, source_type, pydantic
+    )
+    imports.update(reference_imports)
+    return reference
+
+
+@lru_cache(maxsize=None)
+def _get_package_reference(
+    package: str, source_type: str, pydantic: bool
+) -> Tuple[str, FrozenSet[str]]:
+    """
+    Return a Python type name for a proto type reference from within package,
+    along with the imports it requires.
+    """
+    imports: Set[str] = set()
     source_package, source_type = parse_source_type_name(source_type)
 
     current_package: List[str] = package.split(".") if package else []
@@ -86,18 +105,17 @@ def get_type_reference(
         )
 
     if py_package[:1] == ["betterproto"]:
-        return reference_absolute(imports, py_package, py_type)
-
-    if py_package == current_package:
-        return reference_sibling(py_type)
-
-    if py_package[: len(current_package)] == current_package:
-        return reference_descendent(current_package, imports, py_package, py_type)
-
-    if current_package[: len(py_package)] == py_package:
-        return reference_ancestor(current_package, imports, py_package, py_type)
+        reference = reference_absolute(imports, py_package, py_type)
+    elif py_package == current_package:
+        reference = reference_sibling(py_type)
+    elif py_package[: len(current_package)] == current_package:
+        reference = reference_descendent(current_package, imports, py_package, py_type)
+    elif current_package[: len(py_package)] == py_package:
+        reference = reference_ancestor(current_package, imports, py_package, py_type)
+    else:
+        reference = reference_cousin(current_package, imports, py_package, py_type)
 
-    return reference_cousin(current_package, imports, py_package, py_type)
+    return reference, frozenset(imports)
 
 
 def reference_absolute(imports: Set[str], py_package: List[str], py_type: str) -> str:
@@ -22,17 +22,21 @@ except ImportError as err:
 from .models import OutputTemplate
 
 
-def outputfile_compiler(output_file: OutputTemplate) -> str:
-    templates_folder = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), "..", "templates")
-    )
+templates_folder = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "templates")
+)
 
-    env = jinja2.Environment(
-        trim_blocks=True,
-        lstrip_blocks=True,
-        loader=jinja2.FileSystemLoader(templates_folder),
-        undefined=jinja2.StrictUndefined,
-    )
+# Shared by every output file so that the templates are only compiled once.
+env = jinja2.Environment(
+    trim_blocks=True,
+    lstrip_blocks=True,
+    loader=jinja2.FileSystemLoader(templates_folder),
+    undefined=jinja2.StrictUndefined,
+    auto_reload=False,
+)
+
+
+def outputfile_compiler(output_file: OutputTemplate) -> str:
     # Load the body first so we have a compleate list of imports needed.
     body_template = env.get_template("template.py.j2")
     header_template = env.get_template("header.py.j2")
@@ -53,7 +57,7 @@ def outputfile_compiler(output_file: OutputTemplate) -> str:
     )
 
     # Validate the generated code.
-    validator = ModuleValidator(iter(code.splitlines()))
+    validator = ModuleValidator(code.splitlines())
     if not validator.validate():
         message_builder = ["[WARNING]: Generated code has collisions in the module:"]
         for collision, lines in validator.collisions.items():
@@ -35,23 +35,21 @@ from dataclasses import (
     dataclass,
     field,
 )
+from functools import (
+    cached_property,
+    lru_cache,
+)
 from typing import (
     Dict,
-    Iterable,
-    Iterator,
     List,
     Optional,
     Set,
+    Tuple,
     Type,
     Union,
 )
 
 import betterproto
-from betterproto.compile.naming import (
-    pythonize_class_name,
-    pythonize_field_name,
-    pythonize_method_name,
-)
 from betterproto.lib.google.protobuf import (
     DescriptorProto,
     EnumDescriptorProto,
@@ -61,10 +59,10 @@ from betterproto.lib.google.protobuf import (
     FieldDescriptorProtoType,
     FileDescriptorProto,
     MethodDescriptorProto,
+    SourceCodeInfoLocation,
 )
 from betterproto.lib.google.protobuf.compiler import CodeGeneratorRequest
 
-from .. import which_one_of
 from ..compile.importing import (
     get_type_reference,
     parse_source_type_name,
@@ -86,46 +84,74 @@ from .typing_compiler import (
 PLACEHOLDER = object()
 
 # Organize proto types into categories
-PROTO_FLOAT_TYPES = (
-    FieldDescriptorProtoType.TYPE_DOUBLE,  # 1
-    FieldDescriptorProtoType.TYPE_FLOAT,  # 2
+PROTO_FLOAT_TYPES = frozenset(
+    {
+        FieldDescriptorProtoType.TYPE_DOUBLE,  # 1
+        FieldDescriptorProtoType.TYPE_FLOAT,  # 2
+    }
 )
-PROTO_INT_TYPES = (
-    FieldDescriptorProtoType.TYPE_INT64,  # 3
-    FieldDescriptorProtoType.TYPE_UINT64,  # 4
-    FieldDescriptorProtoType.TYPE_INT32,  # 5
-    FieldDescriptorProtoType.TYPE_FIXED64,  # 6
-    FieldDescriptorProtoType.TYPE_FIXED32,  # 7
-    FieldDescriptorProtoType.TYPE_UINT32,  # 13
-    FieldDescriptorProtoType.TYPE_SFIXED32,  # 15
-    FieldDescriptorProtoType.TYPE_SFIXED64,  # 16
-    FieldDescriptorProtoType.TYPE_SINT32,  # 17
-    FieldDescriptorProtoType.TYPE_SINT64,  # 18
+PROTO_INT_TYPES = frozenset(
+    {
+        FieldDescriptorProtoType.TYPE_INT64,  # 3
+        FieldDescriptorProtoType.TYPE_UINT64,  # 4
+        FieldDescriptorProtoType.TYPE_INT32,  # 5
+        FieldDescriptorProtoType.TYPE_FIXED64,  # 6
+        FieldDescriptorProtoType.TYPE_FIXED32,  # 7
+        FieldDescriptorProtoType.TYPE_UINT32,  # 13
+        FieldDescriptorProtoType.TYPE_SFIXED32,  # 15
+        FieldDescriptorProtoType.TYPE_SFIXED64,  # 16
+        FieldDescriptorProtoType.TYPE_SINT32,  # 17
+        FieldDescriptorProtoType.TYPE_SINT64,  # 18
+    }
 )
-PROTO_BOOL_TYPES = (FieldDescriptorProtoType.TYPE_BOOL,)  # 8
-PROTO_STR_TYPES = (FieldDescriptorProtoType.TYPE_STRING,)  # 9
-PROTO_BYTES_TYPES = (FieldDescriptorProtoType.TYPE_BYTES,)  # 12
-PROTO_MESSAGE_TYPES = (
-    FieldDescriptorProtoType.TYPE_MESSAGE,  # 11
-    FieldDescriptorProtoType.TYPE_ENUM,  # 14
+PROTO_BOOL_TYPES = frozenset({FieldDescriptorProtoType.TYPE_BOOL})  # 8
+PROTO_STR_TYPES = frozenset({FieldDescriptorProtoType.TYPE_STRING})  # 9
+PROTO_BYTES_TYPES = frozenset({FieldDescriptorProtoType.TYPE_BYTES})  # 12
+PROTO_MESSAGE_TYPES = frozenset(
+    {
+        FieldDescriptorProtoType.TYPE_MESSAGE,  # 11
+        FieldDescriptorProtoType.TYPE_ENUM,  # 14
+    }
 )
-PROTO_MAP_TYPES = (FieldDescriptorProtoType.TYPE_MESSAGE,)  # 11
-PROTO_PACKED_TYPES = (
-    FieldDescriptorProtoType.TYPE_DOUBLE,  # 1
-    FieldDescriptorProtoType.TYPE_FLOAT,  # 2
-    FieldDescriptorProtoType.TYPE_INT64,  # 3
-    FieldDescriptorProtoType.TYPE_UINT64,  # 4
-    FieldDescriptorProtoType.TYPE_INT32,  # 5
-    FieldDescriptorProtoType.TYPE_FIXED64,  # 6
-    FieldDescriptorProtoType.TYPE_FIXED32,  # 7
-    FieldDescriptorProtoType.TYPE_BOOL,  # 8
-    FieldDescriptorProtoType.TYPE_UINT32,  # 13
-    FieldDescriptorProtoType.TYPE_SFIXED32,  # 15
-    FieldDescriptorProtoType.TYPE_SFIXED64,  # 16
-    FieldDescriptorProtoType.TYPE_SINT32,  # 17
-    FieldDescriptorProtoType.TYPE_SINT64,  # 18
+PROTO_MAP_TYPES = frozenset({FieldDescriptorProtoType.TYPE_MESSAGE})  # 11
+PROTO_PACKED_TYPES = frozenset(
+    {
+        FieldDescriptorProtoType.TYPE_DOUBLE,  # 1
+        FieldDescriptorProtoType.TYPE_FLOAT,  # 2
+        FieldDescriptorProtoType.TYPE_INT64,  # 3
+        FieldDescriptorProtoType.TYPE_UINT64,  # 4
+        FieldDescriptorProtoType.TYPE_INT32,  # 5
+        FieldDescriptorProtoType.TYPE_FIXED64,  # 6
+        FieldDescriptorProtoType.TYPE_FIXED32,  # 7
+        FieldDescriptorProtoType.TYPE_BOOL,  # 8
+        FieldDescriptorProtoType.TYPE_UINT32,  # 13
+        FieldDescriptorProtoType.TYPE_SFIXED32,  # 15
+        FieldDescriptorProtoType.TYPE_SFIXED64,  # 16
+        FieldDescriptorProtoType.TYPE_SINT32,  # 17
+        FieldDescriptorProtoType.TYPE_SINT64,  # 18
+    }
 )
 
+# Map each scalar proto type to its Python type name
+PY_TYPE_BY_PROTO_TYPE: Dict[int, str] = {
+    **dict.fromkeys(PROTO_FLOAT_TYPES, "float"),
+    **dict.fromkeys(PROTO_INT_TYPES, "int"),
+    **dict.fromkeys(PROTO_BOOL_TYPES, "bool"),
+    **dict.fromkeys(PROTO_STR_TYPES, "str"),
+    **dict.fromkeys(PROTO_BYTES_TYPES, "bytes"),
+}
+# Name of the betterproto field function for each proto type, e.g. "int32"
+FIELD_TYPE_BY_PROTO_TYPE: Dict[int, str] = {
+    proto_type: proto_type.name.lower().replace("type_", "")
+    for proto_type in FieldDescriptorProtoType
+}
+# Names that would shadow a builtin if used as a field name
+BUILTIN_NAMES = frozenset(dir(builtins))
+# Python types that well-known Duration/Timestamp fields are unwrapped to
+DATETIME_PY_TYPES = frozenset({"datetime", "timedelta"})
+# Type names of the google.protobuf wrapper messages, e.g. .google.protobuf.Int32Value
+WRAPPER_TYPE_NAME_PATTERN = re.compile(r"\.google\.protobuf\.(.+)Value$")
+
 
 def monkey_patch_oneof_index():
     """
@@ -148,44 +174,83 @@ def monkey_patch_oneof_index():
     )
 
 
+# Source code locations of each file indexed by path, keyed by id(file). The file is
+# kept alongside its index so that the id cannot be reused.
+_SOURCE_CODE_LOCATIONS: Dict[
+    int,
+    Tuple[FileDescriptorProto, Dict[Tuple[int, ...], SourceCodeInfoLocation]],
+] = {}
+
+
+def get_source_code_location(
+    proto_file: "FileDescriptorProto", path: Tuple[int, ...]
+) -> Optional[SourceCodeInfoLocation]:
+    """Find the first source code location of proto_file with the given path."""
+    try:
+        _, locations = _SOURCE_CODE_LOCATIONS[id(proto_file)]
+    except KeyError:
+        locations = {}
+        for sci_loc in proto_file.source_code_info.location:
+            locations.setdefault(tuple(sci_loc.path), sci_loc)
+        _SOURCE_CODE_LOCATIONS[id(proto_file)] = (proto_file, locations)
+    return locations.get(tuple(path))
+
+
 def get_comment(
-    proto_file: "FileDescriptorProto", path: List[int], indent: int = 4
+    proto_file: "FileDescriptorProto", path: Tuple[int, ...], indent: int = 4
 ) -> str:
     pad = " " * indent
-    for sci_loc in proto_file.source_code_info.location:
-        if list(sci_loc.path) == path:
-            all_comments = list(sci_loc.leading_detached_comments)
-            if sci_loc.leading_comments:
-                all_comments.append(sci_loc.leading_comments)
-            if sci_loc.trailing_comments:
-                all_comments.append(sci_loc.trailing_comments)
-
-            lines = []
-
-            for comment in all_comments:
-                lines += comment.split("\n")
-                lines.append("")
-
-            # Remove consecutive empty lines
-            lines = [
-                line for i, line in enumerate(lines) if line or (i == 0 or lines[i - 1])
-            ]
-
-            if lines and not lines[-1]:
-                lines.pop()  # Remove the last empty line
-
-            # It is common for one line comments to start with a space, for example: // comment
-            # We don't add this space to the generated file.
-            lines = [line[1:] if line and line[0] == " " else line for line in lines]
-
-            # This is a field, message, enum, service, or method
-            if len(lines) == 1 and len(lines[0]) < 79 - indent - 6:
-                return f'{pad}"""{lines[0]}"""'
-            else:
-                joined = f"\n{pad}".join(lines)
-                return f'{pad}"""\n{pad}{joined}\n{pad}"""'
-
-    return ""
+    sci_loc = get_source_code_location(proto_file, path)
+    if sci_loc is None:
+        return ""
+
+    all_comments = list(sci_loc.leading_detached_comments)
+    if sci_loc.leading_comments:
+        all_comments.append(sci_loc.leading_comments)
+    if sci_loc.trailing_comments:
+        all_comments.append(sci_loc.trailing_comments)
+
+    # Fast path for the common case of a single one line comment
+    if len(all_comments) == 1:
+        line = all_comments[0].rstrip("\n")
+        if line and "\n" not in line:
+            if line[0] == " ":
+                line = line[1:]
+            if len(line) < 79 - indent - 6:
+                return f'{pad}"""{line}"""'
+
+    lines = []
+
+    for comment in all_comments:
+        lines += comment.split("\n")
+        lines.append("")
+
+    # Remove consecutive empty lines
+    lines = [line for i, line in enumerate(lines) if line or (i == 0 or lines[i - 1])]
+
+    if lines and not lines[-1]:
+        lines.pop()  # Remove the last empty line
+
+    # It is common for one line comments to start with a space, for example: // comment
+    # We don't add this space to the generated file.
+    lines = [line[1:] if line and line[0] == " " else line for line in lines]
+
+    # This is a field, message, enum, service, or method
+    if len(lines) == 1 and len(lines[0]) < 79 - indent - 6:
+        return f'{pad}"""{lines[0]}"""'
+    else:
+        joined = f"\n{pad}".join(lines)
+        return f'{pad}"""\n{pad}{joined}\n{pad}"""'
+
+
+@lru_cache(maxsize=None)
+def get_placeholder_field_names(cls: type) -> Tuple[str, ...]:
+    """Names of the dataclass fields of cls that default to PLACEHOLDER."""
+    return tuple(
+        field_name
+        for field_name, field_val in cls.__dataclass_fields__.items()
+        if field_val.default is PLACEHOLDER
+    )
 
 
 class ProtoContentBase:
@@ -193,7 +258,7 @@ class ProtoContentBase:
 
     source_file: FileDescriptorProto
     typing_compiler: TypingCompiler
-    path: List[int]
+    path: Tuple[int, ...]
     comment_indent: int = 4
     parent: Union["betterproto.Message", "OutputTemplate"]
 
@@ -201,11 +266,11 @@ class ProtoContentBase:
 
     def __post_init__(self) -> None:
         """Checks that no fake default fields were left as placeholders."""
-        for field_name, field_val in self.__dataclass_fields__.items():
-            if field_val is PLACEHOLDER:
+        for field_name in get_placeholder_field_names(type(self)):
+            if getattr(self, field_name) is PLACEHOLDER:
                 raise ValueError(f"`{field_name}` is a required field.")
 
-    @property
+    @cached_property
     def output_file(self) -> "OutputTemplate":
         current = self
         while not isinstance(current, OutputTemplate):
@@ -214,10 +279,7 @@ class ProtoContentBase:
 
     @property
     def request(self) -> "PluginRequestCompiler":
-        current = self
-        while not isinstance(current, OutputTemplate):
-            current = current.parent
-        return current.parent_request
+        return self.output_file.parent_request
 
     @property
     def comment(self) -> str:
@@ -233,19 +295,8 @@ class ProtoContentBase:
 class PluginRequestCompiler:
     plugin_request_obj: CodeGeneratorRequest
     output_packages: Dict[str, "OutputTemplate"] = field(default_factory=dict)
-
-    @property
-    def all_messages(self) -> List["MessageCompiler"]:
-        """All of the messages in this request.
-
-        Returns
-        -------
-        List[MessageCompiler]
-            List of all of the messages in this request.
-        """
-        return [
-            msg for output in self.output_packages.values() for msg in output.messages
-        ]
+    # All of the messages in this request, added as they are read
+    all_messages: List["MessageCompiler"] = field(default_factory=list)
 
 
 @dataclass
@@ -259,7 +310,7 @@ class OutputTemplate:
 
     parent_request: PluginRequestCompiler
     package_proto_obj: FileDescriptorProto
-    input_files: List[str] = field(default_factory=list)
+    input_files: List[FileDescriptorProto] = field(default_factory=list)
     imports_end: Set[str] = field(default_factory=set)
     datetime_imports: Set[str] = field(default_factory=set)
     pydantic_imports: Set[str] = field(default_factory=set)
@@ -271,6 +322,7 @@ class OutputTemplate:
     pydantic_dataclasses: bool = False
     output: bool = True
     typing_compiler: TypingCompiler = field(default_factory=DirectImportTypingCompiler)
+    python_module_imports: Set[str] = field(default_factory=set, init=False)
 
     @property
     def package(self) -> str:
@@ -283,25 +335,25 @@ class OutputTemplate:
         """
         return self.package_proto_obj.package
 
-    @property
-    def input_filenames(self) -> Iterable[str]:
+    @cached_property
+    def input_filenames(self) -> Tuple[str, ...]:
         """Names of the input files used to build this output.
 
         Returns
         -------
-        Iterable[str]
+        Tuple[str, ...]
             Names of the input files used to build this output.
         """
-        return sorted(f.name for f in self.input_files)
+        return tuple(sorted(f.name for f in self.input_files))
 
-    @property
-    def python_module_imports(self) -> Set[str]:
+    def finalize(self) -> None:
+        """Collect the module imports once all messages and services are read."""
         imports = set()
 
         has_deprecated = False
         if any(m.deprecated for m in self.messages):
             has_deprecated = True
-        if any(x for x in self.messages if any(x.deprecated_fields)):
+        if any(x.has_deprecated_fields for x in self.messages):
             has_deprecated = True
         if any(
             any(m.proto_obj.options.deprecated for m in s.methods)
@@ -314,7 +366,7 @@ class OutputTemplate:
 
         if self.builtins_import:
             imports.add("builtins")
-        return imports
+        self.python_module_imports = imports
 
 
 @dataclass
@@ -325,12 +377,16 @@ class MessageCompiler(ProtoContentBase):
     typing_compiler: TypingCompiler
     parent: Union["MessageCompiler", OutputTemplate] = PLACEHOLDER
     proto_obj: DescriptorProto = PLACEHOLDER
-    path: List[int] = PLACEHOLDER
+    path: Tuple[int, ...] = PLACEHOLDER
     fields: List[Union["FieldCompiler", "MessageCompiler"]] = field(
         default_factory=list
     )
     deprecated: bool = field(default=False, init=False)
     builtins_types: Set[str] = field(default_factory=set)
+    deprecated_fields: List[str] = field(default_factory=list, init=False)
+    has_deprecated_fields: bool = field(default=False, init=False)
+    has_oneof_fields: bool = field(default=False, init=False)
+    has_message_field: bool = field(default=False, init=False)
 
     def __post_init__(self) -> None:
         # Add message to output file
@@ -339,40 +395,49 @@ class MessageCompiler(ProtoContentBase):
                 self.output_file.enums.append(self)
             else:
                 self.output_file.messages.append(self)
+                self.request.all_messages.append(self)
         self.deprecated = self.proto_obj.options.deprecated
         super().__post_init__()
 
-    @property
+    @cached_property
     def proto_name(self) -> str:
         return self.proto_obj.name
 
-    @property
+    @cached_property
     def py_name(self) -> str:
         return pythonize_class_name(self.proto_name)
 
-    @property
-    def deprecated_fields(self) -> Iterator[str]:
-        for f in self.fields:
-            if f.deprecated:
-                yield f.py_name
+    def finalize(self) -> None:
+        """Summarize the message's fields once all of them have been attached."""
+        self.deprecated_fields = [f.py_name for f in self.fields if f.deprecated]
+        self.has_deprecated_fields = bool(self.deprecated_fields)
+        self.has_oneof_fields = any(
+            isinstance(field, OneOfFieldCompiler) for field in self.fields
+        )
+        self.has_message_field = any(
+            field.proto_obj.type in PROTO_MESSAGE_TYPES
+            for field in self.fields
+            if isinstance(field.proto_obj, FieldDescriptorProto)
+        )
 
-    @property
-    def has_deprecated_fields(self) -> bool:
-        return any(self.deprecated_fields)
 
-    @property
-    def has_oneof_fields(self) -> bool:
-        return any(isinstance(field, OneOfFieldCompiler) for field in self.fields)
+# Map entry types of each message, indexed on first use. The message is kept
+# alongside its index so that its id is not reused while the index exists.
+_MAP_ENTRIES: Dict[int, Tuple[DescriptorProto, Dict[str, DescriptorProto]]] = {}
 
-    @property
-    def has_message_field(self) -> bool:
-        return any(
-            (
-                field.proto_obj.type in PROTO_MESSAGE_TYPES
-                for field in self.fields
-                if isinstance(field.proto_obj, FieldDescriptorProto)
-            )
-        )
+
+def get_map_entries(parent_message: DescriptorProto) -> Dict[str, DescriptorProto]:
+    """Map entry types nested in parent_message, by lower case name without "_"."""
+    try:
+        _, map_entries = _MAP_ENTRIES[id(parent_message)]
+    except KeyError:
+        map_entries = {
+            nested.name.replace("_", "").lower(): nested
+            for nested in parent_message.nested_type
+            if nested.options.map_entry
+        }
+        _MAP_ENTRIES[id(parent_message)] = (parent_message, map_entries)
+    return map_entries
 
 
 def is_map(
@@ -387,12 +452,7 @@ def is_map(
         message_type = proto_field_obj.type_name.split(".").pop().lower()
         map_entry = f"{proto_field_obj.name.replace('_', '').lower()}entry"
         if message_type == map_entry:
-            for nested in parent_message.nested_type:  # parent message
-                if (
-                    nested.name.replace("_", "").lower() == map_entry
-                    and nested.options.map_entry
-                ):
-                    return True
+            return map_entry in get_map_entries(parent_message)
     return False
 
 
@@ -407,15 +467,39 @@ def is_oneof(proto_field_obj: FieldDescriptorProto) -> bool:
         we have to hack the generated FieldDescriptorProto class for this to work.
         The hack consists of setting group="oneof_index" in the field metadata,
         essentially making oneof_index the sole member of a one_of group, which allows
-        us to tell whether it was set, via the which_one_of interface.
+        us to tell whether it was set, by checking whether it is the current member
+        of that group.
     """
 
     return (
         not proto_field_obj.proto3_optional
-        and which_one_of(proto_field_obj, "oneof_index")[0] == "oneof_index"
+        and proto_field_obj._group_current.get("oneof_index") == "oneof_index"
     )
 
 
+def get_py_type(
+    proto_field_obj: FieldDescriptorProto,
+    output_file: OutputTemplate,
+    typing_compiler: TypingCompiler,
+) -> str:
+    """String representation of the Python type of proto_field_obj."""
+    proto_type = proto_field_obj.type
+    py_type = PY_TYPE_BY_PROTO_TYPE.get(proto_type)
+    if py_type is not None:
+        return py_type
+    elif proto_type in PROTO_MESSAGE_TYPES:
+        # Type referencing another defined Message or a named enum
+        return get_type_reference(
+            package=output_file.package,
+            imports=output_file.imports_end,
+            source_type=proto_field_obj.type_name,
+            typing_compiler=typing_compiler,
+            pydantic=output_file.pydantic_dataclasses,
+        )
+    else:
+        raise NotImplementedError(f"Unknown type {proto_type}")
+
+
 @dataclass
 class FieldCompiler(MessageCompiler):
     parent: MessageCompiler = PLACEHOLDER
@@ -430,17 +514,14 @@ class FieldCompiler(MessageCompiler):
 
     def get_field_string(self, indent: int = 4) -> str:
         """Construct string representation of this field as a field."""
-        name = f"{self.py_name}"
-        annotations = f": {self.annotation}"
-        field_args = ", ".join(
-            ([""] + self.betterproto_field_args) if self.betterproto_field_args else []
-        )
-        betterproto_field_type = (
+        field_args = "".join(f", {arg}" for arg in self.betterproto_field_args)
+        field_string = (
+            f"{self.py_name}: {self.annotation} = "
             f"betterproto.{self.field_type}_field({self.proto_obj.number}{field_args})"
         )
-        if self.py_name in dir(builtins):
+        if self.py_name in BUILTIN_NAMES:
             self.parent.builtins_types.add(self.py_name)
-        return f"{name}{annotations} = {betterproto_field_type}"
+        return field_string
 
     @property
     def betterproto_field_args(self) -> List[str]:
@@ -453,14 +534,7 @@ class FieldCompiler(MessageCompiler):
 
     @property
     def datetime_imports(self) -> Set[str]:
-        imports = set()
-        annotation = self.annotation
-        # FIXME: false positives - e.g. `MyDatetimedelta`
-        if "timedelta" in annotation:
-            imports.add("timedelta")
-        if "datetime" in annotation:
-            imports.add("datetime")
-        return imports
+        return DATETIME_PY_TYPES.intersection((self.py_type,))
 
     @property
     def pydantic_imports(self) -> Set[str]:
@@ -469,27 +543,29 @@ class FieldCompiler(MessageCompiler):
     @property
     def use_builtins(self) -> bool:
         return self.py_type in self.parent.builtins_types or (
-            self.py_type == self.py_name and self.py_name in dir(builtins)
+            self.py_type == self.py_name and self.py_name in BUILTIN_NAMES
         )
 
     def add_imports_to(self, output_file: OutputTemplate) -> None:
-        output_file.datetime_imports.update(self.datetime_imports)
-        output_file.pydantic_imports.update(self.pydantic_imports)
+        # Only message fields can unwrap to datetime types
+        if self.proto_obj.type in PROTO_MESSAGE_TYPES:
+            output_file.datetime_imports.update(self.datetime_imports)
+        pydantic_imports = self.pydantic_imports
+        if pydantic_imports:
+            output_file.pydantic_imports.update(pydantic_imports)
         output_file.builtins_import = output_file.builtins_import or self.use_builtins
 
-    @property
+    @cached_property
     def field_wraps(self) -> Optional[str]:
         """Returns betterproto wrapped field type or None."""
-        match_wrapper = re.match(
-            r"\.google\.protobuf\.(.+)Value$", self.proto_obj.type_name
-        )
+        match_wrapper = WRAPPER_TYPE_NAME_PATTERN.match(self.proto_obj.type_name)
         if match_wrapper:
             wrapped_type = "TYPE_" + match_wrapper.group(1).upper()
             if hasattr(betterproto, wrapped_type):
                 return f"betterproto.{wrapped_type}"
         return None
 
-    @property
+    @cached_property
     def repeated(self) -> bool:
         return (
             self.proto_obj.label == FieldDescriptorProtoLabel.LABEL_REPEATED
@@ -500,54 +576,30 @@ class FieldCompiler(MessageCompiler):
     def optional(self) -> bool:
         return self.proto_obj.proto3_optional
 
-    @property
+    @cached_property
     def field_type(self) -> str:
         """String representation of proto field type."""
-        return (
-            FieldDescriptorProtoType(self.proto_obj.type)
-            .name.lower()
-            .replace("type_", "")
-        )
+        return FIELD_TYPE_BY_PROTO_TYPE[self.proto_obj.type]
 
-    @property
+    @cached_property
     def packed(self) -> bool:
         """True if the wire representation is a packed format."""
         return self.repeated and self.proto_obj.type in PROTO_PACKED_TYPES
 
-    @property
+    @cached_property
     def py_name(self) -> str:
         """Pythonized name."""
         return pythonize_field_name(self.proto_name)
 
-    @property
+    @cached_property
     def proto_name(self) -> str:
         """Original protobuf name."""
         return self.proto_obj.name
 
-    @property
+    @cached_property
     def py_type(self) -> str:
         """String representation of Python type."""
-        if self.proto_obj.type in PROTO_FLOAT_TYPES:
-            return "float"
-        elif self.proto_obj.type in PROTO_INT_TYPES:
-            return "int"
-        elif self.proto_obj.type in PROTO_BOOL_TYPES:
-            return "bool"
-        elif self.proto_obj.type in PROTO_STR_TYPES:
-            return "str"
-        elif self.proto_obj.type in PROTO_BYTES_TYPES:
-            return "bytes"
-        elif self.proto_obj.type in PROTO_MESSAGE_TYPES:
-            # Type referencing another defined Message or a named enum
-            return get_type_reference(
-                package=self.output_file.package,
-                imports=self.output_file.imports_end,
-                source_type=self.proto_obj.type_name,
-                typing_compiler=self.typing_compiler,
-                pydantic=self.output_file.pydantic_dataclasses,
-            )
-        else:
-            raise NotImplementedError(f"Unknown type {self.proto_obj.type}")
+        return get_py_type(self.proto_obj, self.output_file, self.typing_compiler)
 
     @property
     def annotation(self) -> str:
@@ -595,34 +647,26 @@ class MapEntryCompiler(FieldCompiler):
     def __post_init__(self) -> None:
         """Explore nested types and set k_type and v_type if unset."""
         map_entry = f"{self.proto_obj.name.replace('_', '').lower()}entry"
-        for nested in self.parent.proto_obj.nested_type:
-            if (
-                nested.name.replace("_", "").lower() == map_entry
-                and nested.options.map_entry
-            ):
-                # Get Python types
-                self.py_k_type = FieldCompiler(
-                    source_file=self.source_file,
-                    parent=self,
-                    proto_obj=nested.field[0],  # key
-                    typing_compiler=self.typing_compiler,
-                ).py_type
-                self.py_v_type = FieldCompiler(
-                    source_file=self.source_file,
-                    parent=self,
-                    proto_obj=nested.field[1],  # value
-                    typing_compiler=self.typing_compiler,
-                ).py_type
-
-                # Get proto types
-                self.proto_k_type = FieldDescriptorProtoType(nested.field[0].type).name
-                self.proto_v_type = FieldDescriptorProtoType(nested.field[1].type).name
+        nested = get_map_entries(self.parent.proto_obj).get(map_entry)
+        if nested is not None:
+            # Get Python types
+            key, value = nested.field[0], nested.field[1]
+            self.py_k_type = get_py_type(key, self.output_file, self.typing_compiler)
+            self.py_v_type = get_py_type(value, self.output_file, self.typing_compiler)
+
+            # Get proto types
+            self.proto_k_type = FieldDescriptorProtoType(key.type).name
+            self.proto_v_type = FieldDescriptorProtoType(value.type).name
         super().__post_init__()  # call FieldCompiler-> MessageCompiler __post_init__
 
     @property
     def betterproto_field_args(self) -> List[str]:
         return [f"betterproto.{self.proto_k_type}", f"betterproto.{self.proto_v_type}"]
 
+    @property
+    def datetime_imports(self) -> Set[str]:
+        return DATETIME_PY_TYPES.intersection((self.py_k_type, self.py_v_type))
+
     @property
     def field_type(self) -> str:
         return "map"
@@ -660,7 +704,7 @@ class EnumDefinitionCompiler(MessageCompiler):
                 ),
                 value=entry_proto_value.number,
                 comment=get_comment(
-                    proto_file=self.source_file, path=self.path + [2, entry_number]
+                    proto_file=self.source_file, path=self.path + (2, entry_number)
                 ),
             )
             for entry_number, entry_proto_value in enumerate(self.proto_obj.value)
@@ -673,7 +717,7 @@ class ServiceCompiler(ProtoContentBase):
     source_file: FileDescriptorProto
     parent: OutputTemplate = PLACEHOLDER
     proto_obj: DescriptorProto = PLACEHOLDER
-    path: List[int] = PLACEHOLDER
+    path: Tuple[int, ...] = PLACEHOLDER
     methods: List["ServiceMethodCompiler"] = field(default_factory=list)
 
     def __post_init__(self) -> None:
@@ -681,11 +725,11 @@ class ServiceCompiler(ProtoContentBase):
         self.output_file.services.append(self)
         super().__post_init__()  # check for unset fields
 
-    @property
+    @cached_property
     def proto_name(self) -> str:
         return self.proto_obj.name
 
-    @property
+    @cached_property
     def py_name(self) -> str:
         return pythonize_class_name(self.proto_name)
 
@@ -695,41 +739,44 @@ class ServiceMethodCompiler(ProtoContentBase):
     source_file: FileDescriptorProto
     parent: ServiceCompiler
     proto_obj: MethodDescriptorProto
-    path: List[int] = PLACEHOLDER
+    path: Tuple[int, ...] = PLACEHOLDER
     comment_indent: int = 8
 
     def __post_init__(self) -> None:
+        # The imports are the same for every method, so only the first method of a
+        # service needs to add them.
+        if not self.parent.methods:
+            self.output_file.imports_type_checking_only.update(
+                (
+                    "import grpclib.server",
+                    "from betterproto.grpc.grpclib_client import MetadataLike",
+                    "from grpclib.metadata import Deadline",
+                )
+            )
+
         # Add method to service
         self.parent.methods.append(self)
 
-        self.output_file.imports_type_checking_only.add("import grpclib.server")
-        self.output_file.imports_type_checking_only.add(
-            "from betterproto.grpc.grpclib_client import MetadataLike"
-        )
-        self.output_file.imports_type_checking_only.add(
-            "from grpclib.metadata import Deadline"
-        )
-
         super().__post_init__()  # check for unset fields
 
-    @property
+    @cached_property
     def py_name(self) -> str:
         """Pythonized method name."""
         return pythonize_method_name(self.proto_obj.name)
 
-    @property
+    @cached_property
     def proto_name(self) -> str:
         """Original protobuf name."""
         return self.proto_obj.name
 
-    @property
+    @cached_property
     def route(self) -> str:
         package_part = (
             f"{self.output_file.package}." if self.output_file.package else ""
         )
         return f"/{package_part}{self.parent.proto_name}/{self.proto_name}"
 
-    @property
+    @cached_property
     def py_input_message_type(self) -> str:
         """String representation of the Python type corresponding to the
         input message.
@@ -759,7 +806,7 @@ class ServiceMethodCompiler(ProtoContentBase):
         """
         return pythonize_field_name(self.py_input_message_type)
 
-    @property
+    @cached_property
     def py_output_message_type(self) -> str:
         """String representation of the Python type corresponding to the
         output message.
@@ -1,12 +1,10 @@
-import re
-from collections import defaultdict
 from dataclasses import (
     dataclass,
     field,
 )
+from itertools import dropwhile
 from typing import (
     Dict,
-    Iterator,
     List,
     Tuple,
 )
@@ -14,27 +12,31 @@ from typing import (
 
 @dataclass
 class ModuleValidator:
-    line_iterator: Iterator[str]
+    lines: List[str]
     line_number: int = field(init=False, default=0)
 
     collisions: Dict[str, List[Tuple[int, str]]] = field(
-        init=False, default_factory=lambda: defaultdict(list)
+        init=False, default_factory=dict
     )
+    _first_seen: Dict[str, Tuple[int, str]] = field(init=False, default_factory=dict)
 
     def add_import(self, imp: str, number: int, full_line: str):
         """
         Adds an import to be tracked.
         """
-        self.collisions[imp].append((number, full_line))
+        if imp not in self._first_seen:
+            self._first_seen[imp] = (number, full_line)
+        elif imp in self.collisions:
+            self.collisions[imp].append((number, full_line))
+        else:
+            self.collisions[imp] = [self._first_seen[imp], (number, full_line)]
 
     def process_import(self, imp: str):
         """
         Filters out the import to its actual value.
         """
-        if " as " in imp:
-            imp = imp[imp.index(" as ") + 4 :]
-
-        imp = imp.strip()
+        _, alias, imp_alias = imp.partition(" as ")
+        imp = (imp_alias if alias else imp).strip()
         assert " " not in imp, imp
         return imp
 
@@ -44,16 +46,15 @@ class ModuleValidator:
         """
         # Filter the first line and remove anything before the import statement.
         full_line = line
-        line = line.split("import", 1)[1]
-        if "(" in line:
+        line = line.partition("import")[2]
+        _, parenthesis, after_parenthesis = line.partition("(")
+        if parenthesis:
             conditional = lambda line: ")" not in line
+            # Remove open parenthesis.
+            line = after_parenthesis
         else:
             conditional = lambda line: "\\" in line
 
-        # Remove open parenthesis if it exists.
-        if "(" in line:
-            line = line[line.index("(") + 1 :]
-
         # Choose the conditional based on how multiline imports are formatted.
         while conditional(line):
             # Split the line by commas
@@ -65,13 +66,13 @@ class ModuleValidator:
                 if imp:
                     self.add_import(imp, self.line_number, full_line)
             # Get the next line
-            full_line = line = next(self.line_iterator)
-            # Increment the line number
             self.line_number += 1
+            if self.line_number >= len(self.lines):
+                return
+            full_line = line = self.lines[self.line_number]
 
         # validate the last line
-        if ")" in line:
-            line = line[: line.index(")")]
+        line = line.partition(")")[0]
         imports = line.split(",")
         for imp in imports:
             imp = self.process_import(imp)
@@ -83,7 +84,7 @@ class ModuleValidator:
         Extracts an import from a line.
         """
         whole_line = line
-        line = line[line.index("import") + 6 :]
+        line = line.partition("import")[2]
         values = line.split(",")
         for v in values:
             self.add_import(self.process_import(v), self.line_number, whole_line)
@@ -92,35 +93,30 @@ class ModuleValidator:
         """
         Evaluate each line for names in the module.
         """
-        line = next(self.line_iterator)
-
-        # Skip lines with indentation or comments
-        if (
-            # Skip indents and whitespace.
-            line.startswith(" ")
-            or line == "\n"
-            or line.startswith("\t")
-            or
-            # Skip comments
-            line.startswith("#")
-            or
-            # Skip  decorators
-            line.startswith("@")
-        ):
+        line = self.lines[self.line_number]
+
+        # Skip empty lines, indents and whitespace, comments and decorators.
+        if not line or line[0] in " \t\n#@":
             self.line_number += 1
             return
 
         # Skip docstrings.
-        if line.startswith('"""') or line.startswith("'''"):
+        if line.startswith(('"""', "'''")):
             quote = line[0] * 3
-            line = line[3:]
-            while quote not in line:
-                line = next(self.line_iterator)
+            if quote not in line[3:]:
+                # Jump straight to the line closing the docstring.
+                self.line_number = next(
+                    dropwhile(
+                        lambda number: quote not in self.lines[number],
+                        range(self.line_number + 1, len(self.lines)),
+                    ),
+                    len(self.lines),
+                )
             self.line_number += 1
             return
 
         # Evaluate Imports.
-        if line.startswith("from ") or line.startswith("import "):
+        if line.startswith(("from ", "import ")):
             if "(" in line or "\\" in line:
                 self.evaluate_multiline_import(line)
             else:
@@ -128,20 +124,20 @@ class ModuleValidator:
 
         # Evaluate Classes.
         elif line.startswith("class "):
-            class_name = re.search(r"class (\w+)", line).group(1)
-            if class_name:
+            class_name = line[6:].split("(", 1)[0].split(":", 1)[0].strip()
+            if class_name.isidentifier():
                 self.add_import(class_name, self.line_number, line)
 
         # Evaluate Functions.
         elif line.startswith("def "):
-            function_name = re.search(r"def (\w+)", line).group(1)
-            if function_name:
+            function_name = line[4:].split("(", 1)[0].strip()
+            if function_name.isidentifier():
                 self.add_import(function_name, self.line_number, line)
 
         # Evaluate direct assignments.
         elif "=" in line:
-            assignment = re.search(r"(\w+)\s*=", line).group(1)
-            if assignment:
+            assignment = line.split("=", 1)[0].split(":", 1)[0].strip()
+            if assignment.isidentifier():
                 self.add_import(assignment, self.line_number, line)
 
         self.line_number += 1
@@ -150,14 +146,8 @@ class ModuleValidator:
         """
         Run Validation.
         """
-        try:
-            while True:
-                self.next()
-        except StopIteration:
-            pass
-
-        # Filter collisions for those with more than one value.
-        self.collisions = {k: v for k, v in self.collisions.items() if len(v) > 1}
+        while self.line_number < len(self.lines):
+            self.next()
 
         # Return True if no collisions are found.
         return not bool(self.collisions)
@@ -1,10 +1,12 @@
-import pathlib
+import os.path
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Generator,
+    Iterator,
     List,
-    Set,
     Tuple,
+    Type,
     Union,
 )
 
@@ -48,87 +50,101 @@ from .typing_compiler import (
 def traverse(
     proto_file: FileDescriptorProto,
 ) -> Generator[
-    Tuple[Union[EnumDescriptorProto, DescriptorProto], List[int]], None, None
+    Tuple[Union[EnumDescriptorProto, DescriptorProto], Tuple[int, ...]], None, None
 ]:
     # Todo: Keep information about nested hierarchy
-    def _traverse(
-        path: List[int],
-        items: Union[List[EnumDescriptorProto], List[DescriptorProto]],
-        prefix: str = "",
-    ) -> Generator[
-        Tuple[Union[EnumDescriptorProto, DescriptorProto], List[int]], None, None
-    ]:
-        for i, item in enumerate(items):
+    # Walk the types depth first with an explicit stack of partially consumed
+    # levels, so that nesting depth does not add generator frames. Enums come
+    # before messages, and a message's enums before its nested messages. Each
+    # level records whether it holds messages, which are the only items that
+    # can have nested types.
+    # This has to stay lazy: a message is read before its nested types are
+    # renamed, which is what lets is_map() match its map entry types by name.
+    stack: List[
+        Tuple[
+            Tuple[int, ...],
+            Iterator[Tuple[int, Union[EnumDescriptorProto, DescriptorProto]]],
+            str,
+            bool,
+        ]
+    ] = [
+        ((4,), enumerate(proto_file.message_type), "", True),
+        ((5,), enumerate(proto_file.enum_type), "", False),
+    ]
+    while stack:
+        path, items, prefix, is_message = stack[-1]
+        for i, item in items:
             # Adjust the name since we flatten the hierarchy.
             # Todo: don't change the name, but include full name in returned tuple
             item.name = next_prefix = f"{prefix}_{item.name}"
-            yield item, [*path, i]
-
-            if isinstance(item, DescriptorProto):
-                # Get nested types.
-                yield from _traverse([*path, i, 4], item.enum_type, next_prefix)
-                yield from _traverse([*path, i, 3], item.nested_type, next_prefix)
+            yield item, (*path, i)
 
-    yield from _traverse([5], proto_file.enum_type)
-    yield from _traverse([4], proto_file.message_type)
+            if is_message:
+                nested_type, enum_type = item.nested_type, item.enum_type
+                if nested_type or enum_type:
+                    # Get nested types, then resume this level.
+                    stack.append(
+                        ((*path, i, 3), enumerate(nested_type), next_prefix, True)
+                    )
+                    stack.append(
+                        ((*path, i, 4), enumerate(enum_type), next_prefix, False)
+                    )
+                    break
+        else:
+            stack.pop()
 
 
 def generate_code(request: CodeGeneratorRequest) -> CodeGeneratorResponse:
     response = CodeGeneratorResponse()
 
-    plugin_options = request.parameter.split(",") if request.parameter else []
+    plugin_options = set(request.parameter.split(",")) if request.parameter else set()
     response.supported_features = CodeGeneratorResponseFeature.FEATURE_PROTO3_OPTIONAL
 
+    include_google = "INCLUDE_GOOGLE" in plugin_options
+    pydantic_dataclasses = "pydantic_dataclasses" in plugin_options
+
+    # Gather any typing generation options.
+    typing_opts = [
+        opt[len("typing.") :] for opt in plugin_options if opt.startswith("typing.")
+    ]
+
+    if len(typing_opts) > 1:
+        raise ValueError("Multiple typing options provided")
+    typing_opt = typing_opts[0] if typing_opts else "direct"
+
     request_data = PluginRequestCompiler(plugin_request_obj=request)
     # Gather output packages
     for proto_file in request.proto_file:
         output_package_name = proto_file.package
-        if output_package_name not in request_data.output_packages:
+        output_package = request_data.output_packages.get(output_package_name)
+        if output_package is None:
             # Create a new output if there is no output for this package
-            request_data.output_packages[output_package_name] = OutputTemplate(
+            output_package = OutputTemplate(
                 parent_request=request_data, package_proto_obj=proto_file
             )
+            request_data.output_packages[output_package_name] = output_package
         # Add this input file to the output corresponding to this package
-        request_data.output_packages[output_package_name].input_files.append(proto_file)
+        output_package.input_files.append(proto_file)
 
-        if (
-            proto_file.package == "google.protobuf"
-            and "INCLUDE_GOOGLE" not in plugin_options
-        ):
+        if proto_file.package == "google.protobuf" and not include_google:
             # If not INCLUDE_GOOGLE,
             # skip outputting Google's well-known types
-            request_data.output_packages[output_package_name].output = False
-
-        if "pydantic_dataclasses" in plugin_options:
-            request_data.output_packages[
-                output_package_name
-            ].pydantic_dataclasses = True
+            output_package.output = False
 
-        # Gather any typing generation options.
-        typing_opts = [
-            opt[len("typing.") :] for opt in plugin_options if opt.startswith("typing.")
-        ]
+        if pydantic_dataclasses:
+            output_package.pydantic_dataclasses = True
 
-        if len(typing_opts) > 1:
-            raise ValueError("Multiple typing options provided")
         # Set the compiler type.
-        typing_opt = typing_opts[0] if typing_opts else "direct"
         if typing_opt == "direct":
-            request_data.output_packages[
-                output_package_name
-            ].typing_compiler = DirectImportTypingCompiler()
+            output_package.typing_compiler = DirectImportTypingCompiler()
         elif typing_opt == "root":
-            request_data.output_packages[
-                output_package_name
-            ].typing_compiler = TypingImportTypingCompiler()
+            output_package.typing_compiler = TypingImportTypingCompiler()
         elif typing_opt == "310":
-            request_data.output_packages[
-                output_package_name
-            ].typing_compiler = NoTyping310TypingCompiler()
+            output_package.typing_compiler = NoTyping310TypingCompiler()
 
-    # Read Messages and Enums
-    # We need to read Messages before Services in so that we can
-    # get the references to input/output messages for each service
+    # Read Messages, Enums and Services
+    # Services only reference their input/output messages by type name, which is
+    # resolved when rendering, so they can be read in the same pass as messages.
     for output_package_name, output_package in request_data.output_packages.items():
         for proto_input_file in output_package.input_files:
             for item, path in traverse(proto_input_file):
@@ -138,106 +154,108 @@ def generate_code(request: CodeGeneratorRequest) -> CodeGeneratorResponse:
                     path=path,
                     output_package=output_package,
                 )
-
-    # Read Services
-    for output_package_name, output_package in request_data.output_packages.items():
-        for proto_input_file in output_package.input_files:
             for index, service in enumerate(proto_input_file.service):
                 read_protobuf_service(proto_input_file, service, index, output_package)
+        output_package.finalize()
 
     # Generate output files
-    output_paths: Set[pathlib.Path] = set()
-    for output_package_name, output_package in request_data.output_packages.items():
-        if not output_package.output:
-            continue
+    output_packages = {
+        output_package_name: output_package
+        for output_package_name, output_package in request_data.output_packages.items()
+        if output_package.output
+    }
+    # Render and then format the output files. Most of the time is spent waiting
+    # on the formatter subprocesses, so the packages are compiled concurrently.
+    with ThreadPoolExecutor() as executor:
+        contents = list(executor.map(outputfile_compiler, output_packages.values()))
 
-        # Add files to the response object
-        output_path = pathlib.Path(*output_package_name.split("."), "__init__.py")
-        output_paths.add(output_path)
-
-        response.file.append(
-            CodeGeneratorResponseFile(
-                name=str(output_path),
-                # Render and then format the output file
-                content=outputfile_compiler(output_file=output_package),
-            )
-        )
+    # Add files to the response object. protoc expects "/" separated paths.
+    output_package_parts = [
+        tuple(output_package_name.split(".")) if output_package_name else ()
+        for output_package_name in output_packages
+    ]
+    output_paths = ["/".join((*parts, "__init__.py")) for parts in output_package_parts]
+    output_files = [
+        CodeGeneratorResponseFile(name=output_path, content=content)
+        for output_path, content in zip(output_paths, contents)
+    ]
 
     # Make each output directory a package with __init__ file
+    # Walk up from each package, stopping at directories already visited
+    # through a sibling package so that shared prefixes are only seen once.
+    package_parts = set()
+    for parts in output_package_parts:
+        for depth in range(len(parts) - 1, -1, -1):
+            if parts[:depth] in package_parts:
+                break
+            package_parts.add(parts[:depth])
+    init_file_parts = package_parts.difference(output_package_parts)
     init_files = {
-        directory.joinpath("__init__.py")
-        for path in output_paths
-        for directory in path.parents
-        if not directory.joinpath("__init__.py").exists()
-    } - output_paths
+        init_file
+        for init_file in (
+            "/".join((*parts, "__init__.py")) for parts in init_file_parts
+        )
+        if not os.path.exists(init_file)
+    }
 
-    for init_file in init_files:
-        response.file.append(CodeGeneratorResponseFile(name=str(init_file)))
+    output_files.extend(
+        CodeGeneratorResponseFile(name=init_file) for init_file in init_files
+    )
+    response.file.extend(output_files)
 
-    for output_package_name in sorted(output_paths.union(init_files)):
-        print(f"Writing {output_package_name}", file=sys.stderr)
+    for output_path in sorted(init_files.union(output_paths)):
+        print(f"Writing {output_path}", file=sys.stderr)
 
     return response
 
 
-def _make_one_of_field_compiler(
+def _get_field_compiler_class(
     output_package: OutputTemplate,
-    source_file: "FileDescriptorProto",
-    parent: MessageCompiler,
+    parent_message: DescriptorProto,
     proto_obj: "FieldDescriptorProto",
-    path: List[int],
-) -> FieldCompiler:
-    pydantic = output_package.pydantic_dataclasses
-    Cls = PydanticOneOfFieldCompiler if pydantic else OneOfFieldCompiler
-    return Cls(
-        source_file=source_file,
-        parent=parent,
-        proto_obj=proto_obj,
-        path=path,
-        typing_compiler=output_package.typing_compiler,
-    )
+) -> Type[FieldCompiler]:
+    """The FieldCompiler subclass to compile proto_obj with."""
+    if is_map(proto_obj, parent_message):
+        return MapEntryCompiler
+    if is_oneof(proto_obj):
+        if output_package.pydantic_dataclasses:
+            return PydanticOneOfFieldCompiler
+        return OneOfFieldCompiler
+    return FieldCompiler
 
 
 def read_protobuf_type(
     item: DescriptorProto,
-    path: List[int],
+    path: Tuple[int, ...],
     source_file: "FileDescriptorProto",
     output_package: OutputTemplate,
 ) -> None:
-    if isinstance(item, DescriptorProto):
+    if type(item) is DescriptorProto:
         if item.options.map_entry:
             # Skip generated map entry messages since we just use dicts
             return
         # Process Message
+        typing_compiler = output_package.typing_compiler
         message_data = MessageCompiler(
             source_file=source_file,
             parent=output_package,
             proto_obj=item,
             path=path,
-            typing_compiler=output_package.typing_compiler,
+            typing_compiler=typing_compiler,
         )
         for index, field in enumerate(item.field):
-            if is_map(field, item):
-                MapEntryCompiler(
-                    source_file=source_file,
-                    parent=message_data,
-                    proto_obj=field,
-                    path=path + [2, index],
-                    typing_compiler=output_package.typing_compiler,
-                )
-            elif is_oneof(field):
-                _make_one_of_field_compiler(
-                    output_package, source_file, message_data, field, path + [2, index]
-                )
-            else:
-                FieldCompiler(
-                    source_file=source_file,
-                    parent=message_data,
-                    proto_obj=field,
-                    path=path + [2, index],
-                    typing_compiler=output_package.typing_compiler,
-                )
-    elif isinstance(item, EnumDescriptorProto):
+            field_compiler_class = _get_field_compiler_class(
+                output_package, item, field
+            )
+            field_compiler_class(
+                source_file=source_file,
+                parent=message_data,
+                proto_obj=field,
+                path=path + (2, index),
+                typing_compiler=typing_compiler,
+            )
+        message_data.finalize()
+    elif type(item) is EnumDescriptorProto:
         # Enum
         EnumDefinitionCompiler(
             source_file=source_file,
@@ -258,12 +276,12 @@ def read_protobuf_service(
         source_file=source_file,
         parent=output_package,
         proto_obj=service,
-        path=[6, index],
+        path=(6, index),
     )
     for j, method in enumerate(service.method):
         ServiceMethodCompiler(
             source_file=source_file,
             parent=service_data,
             proto_obj=method,
-            path=[6, index, 2, j],
+            path=(6, index, 2, j),
         )
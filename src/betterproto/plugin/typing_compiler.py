@@ -139,23 +139,27 @@ class TypingImportTypingCompiler(TypingCompiler):
 class NoTyping310TypingCompiler(TypingCompiler):
     _imports: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
 
-    @staticmethod
-    def _fmt(type: str) -> str:  # for now this is necessary till 3.14
-        if type.startswith('"'):
-            return type[1:-1]
-        return type
+    # Quoted types are unquoted before being wrapped, as the whole annotation is
+    # quoted. For now this is necessary till 3.14.
 
     def optional(self, type: str) -> str:
-        return f'"{self._fmt(type)} | None"'
+        if type[:1] == '"':
+            type = type[1:-1]
+        return f'"{type} | None"'
 
     def list(self, type: str) -> str:
-        return f'"list[{self._fmt(type)}]"'
+        if type[:1] == '"':
+            type = type[1:-1]
+        return f'"list[{type}]"'
 
     def dict(self, key: str, value: str) -> str:
-        return f'"dict[{key}, {self._fmt(value)}]"'
+        if value[:1] == '"':
+            value = value[1:-1]
+        return f'"dict[{key}, {value}]"'
 
     def union(self, *types: str) -> str:
-        return f'"{" | ".join(map(self._fmt, types))}"'
+        unquoted = [type[1:-1] if type[:1] == '"' else type for type in types]
+        return f'"{" | ".join(unquoted)}"'
 
     def iterable(self, type: str) -> str:
         self._imports["collections.abc"].add("Iterable")
@@ -1,4 +1,3 @@
-import copy
 import sys
 
 import pytest
@@ -6,6 +5,6 @@ import pytest
 
 @pytest.fixture
 def reset_sys_path():
-    original = copy.deepcopy(sys.path)
+    original = list(sys.path)
     yield
     sys.path = original
@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 import asyncio
 import os
-import platform
 import shutil
 import sys
 from pathlib import Path
@@ -23,11 +22,12 @@ os.environ["PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION"] = "python"
 
 
 def clear_directory(dir_path: Path):
-    for file_or_directory in dir_path.glob("*"):
-        if file_or_directory.is_dir():
-            shutil.rmtree(file_or_directory)
-        else:
-            file_or_directory.unlink()
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
 
 
 async def generate(whitelist: Set[str], verbose: bool):
@@ -41,6 +41,9 @@ async def generate(whitelist: Set[str], verbose: bool):
             continue
         path_whitelist.add(item)
 
+    # Limit the number of protoc processes running at once to the CPU count.
+    semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+    generated_test_case_names = []
     generation_tasks = []
     for test_case_name in sorted(test_case_names):
         test_case_input_path = inputs_path.joinpath(test_case_name).resolve()
@@ -50,14 +53,17 @@ async def generate(whitelist: Set[str], verbose: bool):
             and test_case_name not in name_whitelist
         ):
             continue
+        generated_test_case_names.append(test_case_name)
         generation_tasks.append(
-            generate_test_case_output(test_case_input_path, test_case_name, verbose)
+            generate_test_case_output(
+                test_case_input_path, test_case_name, verbose, semaphore
+            )
         )
 
     failed_test_cases = []
     # Wait for all subprocs and match any failures to names to report
     for test_case_name, result in zip(
-        sorted(test_case_names), await asyncio.gather(*generation_tasks)
+        generated_test_case_names, await asyncio.gather(*generation_tasks)
     ):
         if result != 0:
             failed_test_cases.append(test_case_name)
@@ -73,10 +79,13 @@ async def generate(whitelist: Set[str], verbose: bool):
 
 
 async def generate_test_case_output(
-    test_case_input_path: Path, test_case_name: str, verbose: bool
+    test_case_input_path: Path,
+    test_case_name: str,
+    verbose: bool,
+    semaphore: asyncio.Semaphore,
 ) -> int:
     """
-    Returns the max of the subprocess return values
+    Returns the protoc return value
     """
 
     test_case_output_path_reference = output_path_reference.joinpath(test_case_name)
@@ -90,78 +99,41 @@ async def generate_test_case_output(
     clear_directory(test_case_output_path_reference)
     clear_directory(test_case_output_path_betterproto)
 
-    (
-        (ref_out, ref_err, ref_code),
-        (plg_out, plg_err, plg_code),
-        (plg_out_pyd, plg_err_pyd, plg_code_pyd),
-    ) = await asyncio.gather(
-        protoc(test_case_input_path, test_case_output_path_reference, True),
-        protoc(test_case_input_path, test_case_output_path_betterproto, False),
-        protoc(
-            test_case_input_path, test_case_output_path_betterproto_pyd, False, True
-        ),
-    )
-
-    if ref_code == 0:
-        print(f"\033[31;1;4mGenerated reference output for {test_case_name!r}\033[0m")
-    else:
-        print(
-            f"\033[31;1;4mFailed to generate reference output for {test_case_name!r}\033[0m"
+    # One protoc run generates all three outputs, so the .proto files are only
+    # parsed once per test case. Only the run waits for the semaphore, so that
+    # every case clears the shared output directories before any is written.
+    async with semaphore:
+        out, err, code = await protoc(
+            test_case_input_path,
+            reference_output_dir=test_case_output_path_reference,
+            betterproto_output_dir=test_case_output_path_betterproto,
+            betterproto_pydantic_output_dir=test_case_output_path_betterproto_pyd,
         )
-        print(ref_err.decode())
-
-    if verbose:
-        if ref_out:
-            print("Reference stdout:")
-            sys.stdout.buffer.write(ref_out)
-            sys.stdout.buffer.flush()
-
-        if ref_err:
-            print("Reference stderr:")
-            sys.stderr.buffer.write(ref_err)
-            sys.stderr.buffer.flush()
 
-    if plg_code == 0:
+    if code == 0:
+        print(f"\033[31;1;4mGenerated reference output for {test_case_name!r}\033[0m")
         print(f"\033[31;1;4mGenerated plugin output for {test_case_name!r}\033[0m")
-    else:
-        print(
-            f"\033[31;1;4mFailed to generate plugin output for {test_case_name!r}\033[0m"
-        )
-        print(plg_err.decode())
-
-    if verbose:
-        if plg_out:
-            print("Plugin stdout:")
-            sys.stdout.buffer.write(plg_out)
-            sys.stdout.buffer.flush()
-
-        if plg_err:
-            print("Plugin stderr:")
-            sys.stderr.buffer.write(plg_err)
-            sys.stderr.buffer.flush()
-
-    if plg_code_pyd == 0:
         print(
             f"\033[31;1;4mGenerated plugin (pydantic compatible) output for {test_case_name!r}\033[0m"
         )
     else:
         print(
-            f"\033[31;1;4mFailed to generate plugin (pydantic compatible) output for {test_case_name!r}\033[0m"
+            f"\033[31;1;4mFailed to generate reference and plugin outputs for {test_case_name!r}\033[0m"
         )
-        print(plg_err_pyd.decode())
+        print(err.decode())
 
     if verbose:
-        if plg_out_pyd:
-            print("Plugin stdout:")
-            sys.stdout.buffer.write(plg_out_pyd)
+        if out:
+            print("protoc stdout:")
+            sys.stdout.buffer.write(out)
             sys.stdout.buffer.flush()
 
-        if plg_err_pyd:
-            print("Plugin stderr:")
-            sys.stderr.buffer.write(plg_err_pyd)
+        if err:
+            print("protoc stderr:")
+            sys.stderr.buffer.write(err)
             sys.stderr.buffer.flush()
 
-    return max(ref_code, plg_code, plg_code_pyd)
+    return code
 
 
 HELP = "\n".join(
@@ -189,20 +161,9 @@ def main():
         verbose = False
         whitelist = set(sys.argv[1:])
 
-    if platform.system() == "Windows":
-        # for python version prior to 3.8, loop policy needs to be set explicitly
-        # https://docs.python.org/3/library/asyncio-policy.html#asyncio.DefaultEventLoopPolicy
-        try:
-            asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-        except AttributeError:
-            # python < 3.7 does not have asyncio.WindowsProactorEventLoopPolicy
-            asyncio.get_event_loop_policy().set_event_loop(asyncio.ProactorEventLoop())
-
-    try:
-        asyncio.run(generate(whitelist, verbose))
-    except AttributeError:
-        # compatibility code for python < 3.7
-        asyncio.get_event_loop().run_until_complete(generate(whitelist, verbose))
+    # Subprocesses need the proactor event loop on Windows, which is the default
+    # since python 3.8.
+    asyncio.run(generate(whitelist, verbose))
 
 
 if __name__ == "__main__":
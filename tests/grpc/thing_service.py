@@ -38,10 +38,13 @@ class ThingService:
         request = await stream.recv_message()
         if self.test_hook is not None:
             self.test_hook(stream)
-        for version_num in range(1, 6):
-            await stream.send_message(
-                GetThingResponse(name=request.name, version=version_num)
-            )
+        responses = [
+            GetThingResponse(name=request.name, version=version_num)
+            for version_num in range(1, 6)
+        ]
+        # grpclib streams do not allow concurrent writes, so send them in order.
+        for response in responses:
+            await stream.send_message(response)
 
     async def get_different_things(
         self, stream: "grpclib.server.Stream[GetThingRequest, GetThingResponse]"
@@ -67,6 +67,11 @@ from betterproto.plugin.module_validation import ModuleValidator
             {"test"},
             id="function and variable",
         ),
+        pytest.param(
+            ["def test(): pass", "test: int = 100"],
+            {"test"},
+            id="function and annotated variable",
+        ),
         pytest.param(
             ["def test():", "    test = 3"],
             None,
@@ -101,8 +106,7 @@ from betterproto.plugin.module_validation import ModuleValidator
     ],
 )
 def test_module_validator(text: List[str], expected_collisions: Optional[Set[str]]):
-    line_iterator = iter(text)
-    validator = ModuleValidator(line_iterator)
+    validator = ModuleValidator(text)
     valid = validator.validate()
     if expected_collisions is None:
         assert valid
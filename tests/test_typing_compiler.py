@@ -76,3 +76,12 @@ def test_no_typing_311_typing_compiler():
     assert compiler.imports() == {
         "collections.abc": {"Iterable", "AsyncIterable", "AsyncIterator"}
     }
+
+
+def test_no_typing_310_typing_compiler_unquotes_types():
+    compiler = NoTyping310TypingCompiler()
+    assert compiler.optional('"Message"') == '"Message | None"'
+    assert compiler.list('"Message"') == '"list[Message]"'
+    assert compiler.dict("str", '"Message"') == '"dict[str, Message]"'
+    assert compiler.union('"Message"', "int") == '"Message | int"'
+    assert compiler.imports() == {}
@@ -41,15 +41,34 @@ def get_directories(path):
 
 async def protoc(
     path: Union[str, Path],
-    output_dir: Union[str, Path],
-    reference: bool = False,
-    pydantic_dataclasses: bool = False,
+    *,
+    reference_output_dir: Optional[Union[str, Path]] = None,
+    betterproto_output_dir: Optional[Union[str, Path]] = None,
+    betterproto_pydantic_output_dir: Optional[Union[str, Path]] = None,
 ):
+    """
+    Runs protoc once over the .proto files in path, generating each of the given
+    outputs: the reference python output, betterproto and pydantic compatible
+    betterproto.
+    """
     path: Path = Path(path).resolve()
-    output_dir: Path = Path(output_dir).resolve()
-    python_out_option: str = "python_betterproto_out" if not reference else "python_out"
+    command = [
+        sys.executable,
+        "-m",
+        "grpc.tools.protoc",
+        f"--proto_path={path.as_posix()}",
+    ]
+
+    if reference_output_dir is not None:
+        output_dir = Path(reference_output_dir).resolve()
+        command.append(f"--python_out={output_dir.as_posix()}")
 
-    if pydantic_dataclasses:
+    if betterproto_output_dir is not None:
+        output_dir = Path(betterproto_output_dir).resolve()
+        command.append(f"--python_betterproto_out={output_dir.as_posix()}")
+
+    if betterproto_pydantic_output_dir is not None:
+        output_dir = Path(betterproto_pydantic_output_dir).resolve()
         plugin_path = Path("src/betterproto/plugin/main.py")
 
         if "Win" in platform.system():
@@ -70,26 +89,15 @@ async def protoc(
                 plugin_path = Path(tf.name)
                 atexit.register(os.remove, plugin_path)
 
-        command = [
-            sys.executable,
-            "-m",
-            "grpc.tools.protoc",
+        # The options only apply to this plugin, so the outputs can share a run.
+        command += [
             f"--plugin=protoc-gen-custom={plugin_path.as_posix()}",
             "--experimental_allow_proto3_optional",
             "--custom_opt=pydantic_dataclasses",
-            f"--proto_path={path.as_posix()}",
             f"--custom_out={output_dir.as_posix()}",
-            *[p.as_posix() for p in path.glob("*.proto")],
-        ]
-    else:
-        command = [
-            sys.executable,
-            "-m",
-            "grpc.tools.protoc",
-            f"--proto_path={path.as_posix()}",
-            f"--{python_out_option}={output_dir.as_posix()}",
-            *[p.as_posix() for p in path.glob("*.proto")],
         ]
+
+    command += [p.as_posix() for p in path.glob("*.proto")]
     proc = await asyncio.create_subprocess_exec(
         *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
     )